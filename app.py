@@ -1,19 +1,23 @@
 from flask import Flask, request, jsonify, redirect, session
 from flask_cors import CORS
+from concurrent.futures import Future, ThreadPoolExecutor
+import functools
 import os
 from dotenv import load_dotenv
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials, SpotifyOAuth
-from transformers import pipeline, AutoModelForCausalLM, AutoTokenizer
 from PIL import Image
 import io
-import torch
-from huggingface_hub import login, InferenceClient
+from huggingface_hub import InferenceClient
 import logging
+import re
 import socket
+import threading
 import base64
+import hashlib
 import random
 import requests
+from cachetools import LRUCache, TTLCache, cached
 
 # Configure logging
 logging.basicConfig(
@@ -44,26 +48,71 @@ spotify_client_id = os.getenv('SPOTIFY_CLIENT_ID')
 spotify_client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
 spotify_redirect_uri = os.getenv('SPOTIFY_REDIRECT_URI', 'http://localhost:3000/callback')
 
-if not spotify_client_id or not spotify_client_secret:
-    logger.error("Spotify credentials not found in environment variables")
-    raise ValueError("Spotify credentials not found. Please check your .env file.")
-
-logger.info("Initializing Spotify client...")
-# Initialize Spotify client for app-only operations
-spotify = spotipy.Spotify(client_credentials_manager=SpotifyClientCredentials(
-    client_id=spotify_client_id,
-    client_secret=spotify_client_secret
+# One pooled HTTP session shared by every Spotify client, so calls
+# reuse warm TLS connections instead of re-handshaking per request.
+# spotipy skips its own session setup when one is injected, so transient
+# failures need transport-level retries configured here
+spotify_session = requests.Session()
+spotify_session.mount('https://', requests.adapters.HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=50,
+    max_retries=requests.adapters.Retry(total=3, backoff_factor=0.2)
 ))
 
-# Initialize Hugging Face client
-huggingface_token = os.getenv('HUGGINGFACE_TOKEN')
-if not huggingface_token:
-    logger.error("Hugging Face token not found in environment variables")
-    raise ValueError("Hugging Face token not found. Please check your .env file.")
-
-logger.info("Initializing Hugging Face client...")
-login(token=huggingface_token)
-hf_client = InferenceClient(token=huggingface_token)
+# API clients are created lazily on first use so importing the app (and
+# answering /api/health) never blocks on credential checks or network
+# calls; POST /api/warmup forces initialization up front
+_init_lock = threading.Lock()
+spotify = None
+hf_client = None
+
+def get_spotify():
+    """Lazily create the shared app-only Spotify client"""
+    global spotify
+    if spotify is None:
+        with _init_lock:
+            if spotify is None:
+                if not spotify_client_id or not spotify_client_secret:
+                    logger.error("Spotify credentials not found in environment variables")
+                    raise ValueError("Spotify credentials not found. Please check your .env file.")
+                logger.info("Initializing Spotify client...")
+                spotify = spotipy.Spotify(client_credentials_manager=SpotifyClientCredentials(
+                    client_id=spotify_client_id,
+                    client_secret=spotify_client_secret
+                ), requests_session=spotify_session)
+    return spotify
+
+# Reuse per-user Spotify clients across requests; tokens expire after an
+# hour so the cache TTL stays just under that. The lock serializes all
+# access — TTLCache is not thread-safe and client construction is cheap
+# (no network call), so holding it across the miss path is fine
+user_client_cache = TTLCache(maxsize=1024, ttl=3000)
+_user_client_cache_lock = threading.Lock()
+
+def get_user_spotify(user_token):
+    """Get a (cached) Spotify client authenticated as the user"""
+    with _user_client_cache_lock:
+        client = user_client_cache.get(user_token)
+        if client is None:
+            client = spotipy.Spotify(auth=user_token, requests_session=spotify_session)
+            user_client_cache[user_token] = client
+    return client
+
+def get_hf_client():
+    """Lazily create the shared Hugging Face Inference API client"""
+    global hf_client
+    if hf_client is None:
+        with _init_lock:
+            if hf_client is None:
+                huggingface_token = os.getenv('HUGGINGFACE_TOKEN')
+                if not huggingface_token:
+                    logger.error("Hugging Face token not found in environment variables")
+                    raise ValueError("Hugging Face token not found. Please check your .env file.")
+                logger.info("Initializing Hugging Face client...")
+                # The client token authenticates every API call on its
+                # own; login() only wrote the token to disk redundantly
+                hf_client = InferenceClient(token=huggingface_token, timeout=30)
+    return hf_client
 
 # Initialize Spotify OAuth with additional scopes
 logger.info("Initializing Spotify OAuth...")
@@ -74,58 +123,254 @@ sp_oauth = SpotifyOAuth(
     scope='playlist-modify-public playlist-modify-private user-read-private user-read-email user-read-recently-played user-top-read playlist-read-private playlist-read-collaborative'
 )
 
-logger.info("Initializing models...")
-# Remove local model initialization since we're using the Inference API
-logger.info("Models initialized successfully")
+# Cache recommendation results so repeat mood queries skip the Spotify
+# round trip; entries expire after an hour so results stay reasonably
+# fresh. cachetools caches are not thread-safe and request threads are
+# real under both the dev server and gunicorn, so every access takes
+# the cache's lock
+recommendation_cache = TTLCache(maxsize=2048, ttl=3600)
+_recommendation_cache_lock = threading.Lock()
+
+# Cache image moods by content hash (not the bytes themselves) so
+# re-uploads of the same image skip the remote classification call;
+# locked like the other caches since LRUCache reorders on every hit
+image_mood_cache = LRUCache(maxsize=2048)
+_image_mood_cache_lock = threading.Lock()
+
+# Artist catalogs and search results are stable public data shared
+# across users, so hold them for an hour in front of the Spotify calls.
+# The locks are named module-level objects (not anonymous) so the flush
+# endpoint can take the same lock the decorator uses when clearing
+top_tracks_cache = TTLCache(maxsize=10000, ttl=3600)
+_top_tracks_cache_lock = threading.Lock()
+related_artists_cache = TTLCache(maxsize=10000, ttl=3600)
+_related_artists_cache_lock = threading.Lock()
+search_cache = TTLCache(maxsize=10000, ttl=3600)
+_search_cache_lock = threading.Lock()
+
+@cached(cache=top_tracks_cache, lock=_top_tracks_cache_lock)
+def _cached_top_tracks(artist_id):
+    return get_spotify().artist_top_tracks(artist_id)
+
+@cached(cache=related_artists_cache, lock=_related_artists_cache_lock)
+def _cached_related_artists(artist_id):
+    return get_spotify().artist_related_artists(artist_id)
+
+@cached(cache=search_cache, lock=_search_cache_lock)
+def _cached_search(query, search_type, limit):
+    return get_spotify().search(q=query, type=search_type, limit=limit)
+
+# Shared pool for running independent API round trips concurrently
+executor = ThreadPoolExecutor(max_workers=8)
+
+# Static lookup from common ImageNet labels to mood phrases, so turning
+# classifier output into a searchable mood is a constant-time dict hit
+# instead of another model call. Unknown labels fall back to the raw
+# label text, which Spotify search tolerates.
+IMAGENET_MOOD = {
+    'seashore': 'calm beach chill waves',
+    'lakeside': 'peaceful serene acoustic',
+    'valley': 'open airy folk',
+    'alp': 'epic soaring cinematic',
+    'volcano': 'intense dramatic heavy',
+    'cliff': 'dramatic sweeping atmospheric',
+    'coral reef': 'dreamy tropical colorful',
+    'geyser': 'energetic explosive',
+    'sandbar': 'sunny tropical laid back',
+    'promontory': 'windswept moody atmospheric',
+    'rapeseed': 'bright sunny cheerful',
+    'daisy': 'happy light pop',
+    'sunflower': 'warm upbeat summer',
+    'balloon': 'playful whimsical fun',
+    'umbrella': 'rainy day mellow',
+    'fountain': 'refreshing sparkling light',
+    'castle': 'grand orchestral fantasy',
+    'church': 'solemn choral peaceful',
+    'monastery': 'quiet meditative ambient',
+    'palace': 'regal elegant classical',
+    'lighthouse': 'lonely hopeful ambient',
+    'barn': 'rustic country folk',
+    'boathouse': 'lazy summer acoustic',
+    'candle': 'warm intimate slow',
+    'fireplace': 'cozy warm acoustic',
+    'bonfire': 'festive campfire singalong',
+    'streetcar': 'urban retro groove',
+    'cab': 'city night jazz',
+    'sports car': 'fast energetic driving',
+    'convertible': 'sunny cruising feel good',
+    'mountain bike': 'adventurous upbeat outdoor',
+    'canoe': 'calm drifting acoustic',
+    'pier': 'nostalgic seaside mellow',
+    'tabby': 'cozy lazy afternoon',
+    'golden retriever': 'happy playful feel good',
+    'hummingbird': 'light quick delicate',
+    'snowplow': 'cold wintry quiet',
+    'igloo': 'icy ambient chill',
+    'teddy': 'soft gentle lullaby',
+    'stage': 'live energetic anthems',
+    'grand piano': 'elegant classical piano',
+    'acoustic guitar': 'stripped back acoustic singer-songwriter',
+    'electric guitar': 'rock energetic riffs',
+    'drum': 'rhythmic percussive energetic',
+    'violin': 'emotional strings cinematic',
+    'saxophone': 'smooth late night jazz',
+}
+
+# The system prompt never changes, so build it (and the static Mistral
+# instruction prefix) once at import time rather than on every request
+SYSTEM_PROMPT = """You are a Gen Z Music Vibe Curator.
+Analyze user statements for emotional tone, energy level, and cultural references.
+Match these vibes to appropriate music genres and moods.
+Decipher slang and cultural references.
+Extract keywords and phrases directly from the user's input.
+
+CRITICAL INSTRUCTION: You MUST detect and mention any artists, songs, or albums in the user's input.
+Your response MUST start with "artist: [name]" if an artist is mentioned.
+
+Examples:
+Input: "I like Drake's music"
+Response: "artist: Drake Mood: Hip-hop, R&B, Melodic"
+
+Input: "I love Taylor Swift's songs"
+Response: "artist: Taylor Swift Mood: Pop, Emotional, Storytelling"
+
+Input: "I want something like The Weeknd"
+Response: "artist: The Weeknd Mood: R&B, Dark, Atmospheric"
+
+Format your response concisely and extract the mood, genre, key words and phrases.
+"""
+
+# Stopwords and mood lexicon for the rule-based fast path (USE_LLM=0):
+# Spotify search tolerates loose queries, so extracted keywords are
+# enough to build one without a remote generation call
+STOPWORDS = frozenset("""
+a an the and or but so if then is are was were be been being am i im me
+my we our you your it its of in on at to for with about into over after
+under from up down out off again want wanna like love something anything
+music songs song playlist give make play feel feeling really very just
+some kind type that this
+""".split())
+
+MOOD_LEXICON = frozenset("""
+sad happy chill upbeat mellow rainy sunny dark moody dreamy energetic
+calm angry hype nostalgic romantic lonely cozy summer winter night late
+study workout party dance focus sleepy ambient acoustic lofi emotional
+intense epic soft heavy smooth groovy funky jazzy soulful melancholy
+dramatic peaceful aggressive bittersweet uplifting
+""".split())
+
+def _keyword_mood(prompt):
+    """Extract mood keywords from the prompt without calling the LLM"""
+    tokens = [t for t in re.findall(r"[\w'&-]+", prompt.lower()) if t not in STOPWORDS]
+    mood_hits = [t for t in tokens if t in MOOD_LEXICON]
+    return ' '.join(mood_hits[:5] or tokens[:5])
+
+# Coalesce concurrent identical analyses: the serverless Inference API
+# takes one prompt per request, so the useful batching here is making
+# duplicate in-flight prompts share a single remote call instead of
+# each cache miss firing its own
+_inflight_lock = threading.Lock()
+_inflight_analyses = {}
+
+_EARLY_ENTITY_RE = re.compile(r'artist:\s*(\S+)\s')
+
+def _early_entity(text):
+    """Return the first word after 'artist:' once it is fully generated
+
+    The trailing-whitespace requirement ensures the word is complete
+    rather than a partially streamed token.
+    """
+    match = _EARLY_ENTITY_RE.search(text.lower())
+    return match.group(1) if match else None
 
 def analyze_text_prompt(prompt, user_role=None):
+    """Analyze text prompt, reusing cached results for repeated prompts"""
+    # Normalize the prompt (lowercase, collapse whitespace) so trivially
+    # different versions of the same prompt hit the same cache entry
+    normalized_prompt = ' '.join(prompt.lower().split())
+
+    # USE_LLM=0 skips the Inference API entirely; the keyword heuristic
+    # builds a usable search string but cannot detect mentioned artists,
+    # so the LLM path stays the default
+    if os.getenv('USE_LLM', '1') == '0':
+        mood = _keyword_mood(normalized_prompt)
+        logger.info(f"Keyword-extracted mood: {mood}")
+        return {
+            'mood_description': mood,
+            'raw_response': None,
+            'full_prompt': None,
+            'mentioned_entity': None
+        }
+
+    # First caller for a given prompt runs the analysis; concurrent
+    # duplicates block on its future rather than duplicating the call
+    key = (normalized_prompt, user_role)
+    with _inflight_lock:
+        future = _inflight_analyses.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight_analyses[key] = future
+
+    if not owner:
+        logger.debug(f"Coalescing duplicate in-flight analysis for: {normalized_prompt[:50]}")
+        return future.result()
+
+    try:
+        result = _analyze_text_prompt_uncached(normalized_prompt, user_role)
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight_analyses.pop(key, None)
+
+@functools.lru_cache(maxsize=4096)
+def _analyze_text_prompt_uncached(prompt, user_role=None):
     """Analyze text prompt using the Llama model"""
     try:
         logger.info(f"Analyzing text prompt: {prompt[:50]}...")
         logger.debug(f"User role: {user_role}")
-        
-        # Enhanced system prompt with user role context
-        system_prompt = """You are a Gen Z Music Vibe Curator. 
-        Analyze user statements for emotional tone, energy level, and cultural references. 
-        Match these vibes to appropriate music genres and moods.
-        Decipher slang and cultural references. 
-        Extract keywords and phrases directly from the user's input.
-        
-        CRITICAL INSTRUCTION: You MUST detect and mention any artists, songs, or albums in the user's input.
-        Your response MUST start with "artist: [name]" if an artist is mentioned.
-        
-        Examples:
-        Input: "I like Drake's music"
-        Response: "artist: Drake Mood: Hip-hop, R&B, Melodic"
-        
-        Input: "I love Taylor Swift's songs"
-        Response: "artist: Taylor Swift Mood: Pop, Emotional, Storytelling"
-        
-        Input: "I want something like The Weeknd"
-        Response: "artist: The Weeknd Mood: R&B, Dark, Atmospheric"
-        
-        Format your response concisely and extract the mood, genre, key words and phrases.
-        """
-        
+
         # Add user role context if available
         role_context = "Gen Z brainrot music listener."
         if user_role:
             role_context = f"\nUser Role: {user_role}"
-        
-        # Format prompt for Mistral model
-        full_prompt = f"<s>[INST] {system_prompt}{role_context}\n\nInput: {prompt} [/INST]"
-        
+
+        # The static system prompt goes in the system slot unchanged so
+        # TGI backends can keep its KV cache warm across requests; the
+        # role context and input live in the (varying) user message
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"{role_context}\n\nInput: {prompt}"},
+        ]
+
         logger.debug("Sending request to Hugging Face Inference API")
-        # Use Hugging Face Inference API with Mistral model
-        raw_response = hf_client.text_generation(
-            full_prompt,
+        # Stream tokens from the Mistral model so the Spotify lookup for
+        # a mentioned artist can start as soon as "artist: <name>" is
+        # complete, hiding the search under the rest of the generation
+        pieces = []
+        early_entity = None
+        for chunk in get_hf_client().chat_completion(
+            messages=messages,
             model="mistralai/Mistral-7B-Instruct-v0.3",
-            max_new_tokens=50,
-            temperature=0.7,
-            top_p=0.95,
-            do_sample=True,
-            return_full_text=False
-        )
+            # Only the first line (and first word after "artist:") is
+            # kept, so don't pay for tokens that get thrown away:
+            # greedy decoding, 20 new tokens, stop at a newline
+            max_tokens=20,
+            temperature=0.0,
+            stop=["\n"],
+            stream=True
+        ):
+            pieces.append(chunk.choices[0].delta.content or '')
+            if early_entity is None:
+                early_entity = _early_entity(''.join(pieces))
+                if early_entity:
+                    logger.debug(f"Early entity detected, warming search: {early_entity}")
+                    executor.submit(_cached_search, early_entity, 'artist', 5)
+        raw_response = ''.join(pieces)
         
         # Clean up the response
         response = raw_response.split('\n')[0]  # Take only the first line
@@ -153,7 +398,7 @@ def analyze_text_prompt(prompt, user_role=None):
         return {
             'mood_description': response.strip(),
             'raw_response': raw_response,
-            'full_prompt': full_prompt,
+            'full_prompt': messages,
             'mentioned_entity': mentioned_entity
         }
     except Exception as e:
@@ -164,20 +409,40 @@ def analyze_image(image_data):
     """Analyze image using Hugging Face Inference API"""
     try:
         logger.info("Processing image analysis request")
-        # Convert base64 to image
-        image = Image.open(io.BytesIO(image_data))
-        
+        image_hash = hashlib.sha256(image_data).hexdigest()
+        with _image_mood_cache_lock:
+            cached_mood = image_mood_cache.get(image_hash)
+        if cached_mood is not None:
+            logger.info(f"Returning cached image mood: {cached_mood}")
+            return cached_mood
+
+        # Downscale to ResNet-50's 224x224 input and re-encode before
+        # upload: classification is unaffected but a multi-MB photo
+        # shrinks to a ~15 KB payload
+        image = Image.open(io.BytesIO(image_data)).convert('RGB')
+        image = image.resize((224, 224), Image.BILINEAR)
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=85)
+        payload = buffer.getvalue()
+        logger.debug(f"Resized image payload: {len(image_data)} -> {len(payload)} bytes")
+
         logger.debug("Sending image to Hugging Face Inference API")
-        # Use Hugging Face Inference API for image analysis
-        response = hf_client.image_classification(
-            image,
+        response = get_hf_client().image_classification(
+            payload,
             model="microsoft/resnet-50"
         )
         
-        # Extract the top prediction
-        top_prediction = response[0]
-        logger.info(f"Image analysis result: {top_prediction['label']}")
-        return f"Image mood: {top_prediction['label']}"
+        # Map the top predictions to mood phrases via the static lookup
+        moods = []
+        for prediction in response[:3]:
+            label = prediction['label'].split(',')[0].strip().lower()
+            moods.append(IMAGENET_MOOD.get(label, label))
+        mood = ' '.join(dict.fromkeys(moods))
+        logger.info(f"Image analysis result: {response[0]['label']} -> {mood}")
+        image_mood = f"Image mood: {mood}"
+        with _image_mood_cache_lock:
+            image_mood_cache[image_hash] = image_mood
+        return image_mood
     except Exception as e:
         logger.error(f"Error in image analysis: {str(e)}", exc_info=True)
         raise
@@ -186,29 +451,46 @@ def analyze_user_preferences(user_spotify):
     """Analyze user's listening history and playlists to understand their preferences"""
     try:
         logger.info("Analyzing user preferences")
-        # Get user's top tracks
-        top_tracks = user_spotify.current_user_top_tracks(limit=20, time_range='medium_term')
-        top_artists = user_spotify.current_user_top_artists(limit=20, time_range='medium_term')
-        
-        # Get user's playlists
-        user_playlists = user_spotify.current_user_playlists(limit=50)
-        
-        # Get recently played tracks
-        recently_played = user_spotify.current_user_recently_played(limit=20)
-        
+        # The four history fetches are independent round trips, so issue
+        # them concurrently instead of stacking four RTTs
+        top_tracks_future = executor.submit(
+            user_spotify.current_user_top_tracks, limit=20, time_range='medium_term')
+        top_artists_future = executor.submit(
+            user_spotify.current_user_top_artists, limit=20, time_range='medium_term')
+        playlists_future = executor.submit(user_spotify.current_user_playlists, limit=50)
+        recently_played_future = executor.submit(user_spotify.current_user_recently_played, limit=20)
+
+        top_tracks = top_tracks_future.result()
+        top_artists = top_artists_future.result()
+        user_playlists = playlists_future.result()
+        recently_played = recently_played_future.result()
+
         # Extract genres and artists
         genres = set()
         artists = set()
-        
+
         # Analyze top artists
         for artist in top_artists['items']:
             genres.update(artist['genres'])
             artists.add(artist['name'])
-        
-        # Analyze playlists
-        for playlist in user_playlists['items']:
+
+        # Fan out the per-playlist track fetches as well; the shared pool
+        # size bounds concurrency so we stay under Spotify rate limits.
+        # Only artist names are needed, so ask Spotify to strip the
+        # response down instead of shipping full track objects
+        playlist_futures = [
+            (playlist, executor.submit(
+                user_spotify.playlist_tracks, playlist['id'],
+                fields='items.track.artists.name,next', limit=50))
+            for playlist in user_playlists['items']
+        ]
+        for playlist, future in playlist_futures:
+            if len(artists) >= 200:
+                # Plenty of signal already; skip any fetch not yet started
+                future.cancel()
+                continue
             try:
-                playlist_tracks = user_spotify.playlist_tracks(playlist['id'])
+                playlist_tracks = future.result()
                 for item in playlist_tracks['items']:
                     if item['track']:
                         artists.add(item['track']['artists'][0]['name'])
@@ -231,120 +513,169 @@ def analyze_user_preferences(user_spotify):
         logger.error(f"Error analyzing user preferences: {str(e)}", exc_info=True)
         return None
 
+# Boilerplate phrases stripped from mood descriptions; one compiled
+# alternation (longest phrases first so "Image mood:" wins over "Mood:")
+# scans the string once instead of eight replace() passes
+_REMOVE_PHRASES = [
+    "Based on the image content:", "captures this mood", "Image mood:", "Mood:",
+    "feeling:", "emotion:", "vibe:", "ambiance:", "atmosphere:", "Image:",
+]
+_CLEAN_RE = re.compile(
+    '|'.join(re.escape(p) for p in sorted(_REMOVE_PHRASES, key=len, reverse=True)),
+    re.IGNORECASE
+)
+
 def clean_mood_description_for_spotify(description):
     logger.debug(f"Cleaning mood description: {description}")
-    remove_phrases = [
-        "Based on the image content:", "captures this mood", "Image mood:", "Mood:",
-        "feeling:", "emotion:", "vibe:", "ambiance:", "atmosphere:", "Image:",
-    ]
-    for phrase in remove_phrases:
-        description = description.replace(phrase, "")
-    cleaned = " ".join(description.split()).strip()
+    cleaned = " ".join(_CLEAN_RE.sub('', description).split()).strip()
     logger.debug(f"Cleaned description: {cleaned}")
     return cleaned
 
+# Genre vocabulary and year pattern for extract_filters, precomputed so
+# each call does O(1) set lookups instead of scanning a list per word
+GENRES = frozenset([
+    'rock', 'pop', 'jazz', 'classical', 'hip-hop', 'rap', 'edm',
+    'electronic', 'folk', 'country', 'blues', 'soul', 'r&b',
+    'metal', 'reggae', 'latin', 'indie', 'dance', 'alternative'
+])
+def _is_year(word):
+    """True for literal years in the 1900-2100 range"""
+    return word.isdigit() and 1900 <= int(word) <= 2100
+
 def extract_filters(description):
     logger.debug(f"Extracting filters from: {description}")
-    genres = ['rock', 'pop', 'jazz', 'classical', 'hip-hop', 'rap', 'edm',
-              'electronic', 'folk', 'country', 'blues', 'soul', 'r&b',
-              'metal', 'reggae', 'latin', 'indie', 'dance', 'alternative']
-    filters = []
-    search_terms = []
-
     words = description.lower().replace('-', ' ').split()
-    for word in words:
-        if word in genres:
-            filters.append(f'genre:{word}')
-        elif word.isdigit() and 1900 <= int(word) <= 2100:
-            decade = int(word) - (int(word) % 10)
-            filters.append(f'year:{decade}-{decade+9}')
-        else:
-            search_terms.append(word)
+    filters = [f'genre:{word}' for word in words if word in GENRES]
+    for year in (int(w) for w in words if _is_year(w)):
+        decade = year - (year % 10)
+        filters.append(f'year:{decade}-{decade+9}')
+    search_terms = [w for w in words if w not in GENRES and not _is_year(w)]
 
     result = ' '.join(search_terms), filters
     logger.debug(f"Extracted filters: {result}")
     return result
 
-def get_spotify_recommendations(mood_description, user_token=None, limit=10, mentioned_entity=None):
+@functools.lru_cache(maxsize=1024)
+def _parse_mood(description):
+    """Clean a mood description and extract its filters in one cached pass
+
+    The same description is parsed by both get_spotify_recommendations
+    and create_spotify_playlist within a single request; memoizing the
+    parse means the lowercasing/tokenizing happens once.
+    """
+    cleaned = clean_mood_description_for_spotify(description)
+    base_terms, filters = extract_filters(cleaned)
+    return cleaned, base_terms, tuple(filters)
+
+def build_track(item):
+    """Build the track dictionary returned to the frontend"""
+    return {
+        'name': item['name'],
+        'artist': item['artists'][0]['name'],
+        'album': item['album']['name'],
+        'preview_url': item['preview_url'],
+        'external_url': item['external_urls']['spotify'],
+        'uri': item['uri'],
+        'popularity': item['popularity']
+    }
+
+def get_spotify_recommendations(mood_description, limit=10, mentioned_entity=None):
     logger.info(f"Getting Spotify recommendations for: {mood_description}")
     if mentioned_entity:
         logger.info(f"Prioritizing recommendations based on mentioned entity: {mentioned_entity}")
     
-    cleaned_description = clean_mood_description_for_spotify(mood_description)
-    base_terms, filters = extract_filters(cleaned_description)
-
-    if user_token:
-        sp = spotipy.Spotify(auth=user_token)
-        logger.debug("Using authenticated Spotify client")
-    else:
-        sp = spotipy.Spotify(client_credentials_manager=SpotifyClientCredentials())
-        logger.debug("Using app-only Spotify client")
-
-    # Helper function to build track dictionaries
-    def build_track(item):
-        return {
-            'name': item['name'],
-            'artist': item['artists'][0]['name'],
-            'album': item['album']['name'],
-            'preview_url': item['preview_url'],
-            'external_url': item['external_urls']['spotify'],
-            'popularity': item['popularity']
-        }
-    
+    cleaned_description, base_terms, filters = _parse_mood(mood_description)
+    filters = list(filters)
+
+    # Track data is public, so cached results can be shared across users
+    cache_key = (cleaned_description, mentioned_entity, limit)
+    with _recommendation_cache_lock:
+        cached_tracks = recommendation_cache.get(cache_key)
+    if cached_tracks is not None:
+        logger.info(f"Returning {len(cached_tracks)} cached recommendations")
+        return cached_tracks
+
     # Helper function to log track details
     def log_tracks(track_list):
         for track in track_list:
             logger.info(f"Recommended track: {track['name']} by {track['artist']} (Album: {track['album']}, Popularity: {track['popularity']})")
 
-    # If there's a mentioned entity, prioritize it in the search using a combined search query
+    # If there's a mentioned entity, prioritize it in the search
     if mentioned_entity:
-        combined_results = sp.search(q=mentioned_entity, type="artist,track", limit=limit)
-        artist_items = combined_results.get('artists', {}).get('items', [])
+        # Search artists only first; track results are only used on an
+        # artist miss, so don't pay for both result types every time
+        # (and only artist_items[0] is read, so a limit of 5 is plenty)
+        artist_results = _cached_search(mentioned_entity, 'artist', 5)
+        artist_items = artist_results.get('artists', {}).get('items', [])
         if artist_items:
             artist = artist_items[0]
             artist_id = artist['id']
             logger.info(f"Found artist: {artist['name']} (ID: {artist_id})")
             
-            # Get artist's top tracks
-            artist_top_tracks = sp.artist_top_tracks(artist_id)['tracks']
-            tracks = [build_track(item) for item in artist_top_tracks][:limit//2]
-            
+            # Fetch the artist's top tracks and related artists concurrently;
+            # the two Spotify round trips are independent of each other
+            top_tracks_future = executor.submit(_cached_top_tracks, artist_id)
+            related_artists_future = executor.submit(_cached_related_artists, artist_id)
+
+            artist_top_tracks = top_tracks_future.result()['tracks']
+            # Build into a dict keyed by track ID so duplicates are
+            # dropped as they arrive and we can stop once full
+            seen = {}
+            for item in artist_top_tracks[:limit//2]:
+                seen.setdefault(item['id'], build_track(item))
+
             try:
-                related_artists = sp.artist_related_artists(artist_id)['artists'][:2]
-                for related_artist in related_artists:
-                    related_tracks = sp.artist_top_tracks(related_artist['id'])['tracks']
-                    tracks.extend([build_track(item) for item in related_tracks][:limit//4])
+                related_artists = related_artists_future.result()['artists'][:2]
+                # The per-related-artist top-track fetches are independent
+                # too, so issue them all before collecting any result
+                related_futures = [
+                    executor.submit(_cached_top_tracks, related_artist['id'])
+                    for related_artist in related_artists
+                ]
+                for future in related_futures:
+                    for item in future.result()['tracks'][:limit//4]:
+                        if len(seen) >= limit:
+                            break
+                        seen.setdefault(item['id'], build_track(item))
             except Exception as e:
                 logger.warning(f"Could not get related artists: {str(e)}")
-                more_tracks = sp.artist_top_tracks(artist_id)['tracks'][limit//2:limit]
-                tracks.extend([build_track(item) for item in more_tracks])
+                for item in artist_top_tracks[limit//2:limit]:
+                    seen.setdefault(item['id'], build_track(item))
             
-            # Remove duplicates and limit to requested size
-            tracks = list({track['name']: track for track in tracks}.values())[:limit]
+            tracks = list(seen.values())[:limit]
             logger.info(f"Found {len(tracks)} tracks based on artist and related artists")
             log_tracks(tracks)
+            with _recommendation_cache_lock:
+                recommendation_cache[cache_key] = tracks
             return tracks
         else:
-            # If no artist found, try track search from combined results
-            track_items = combined_results.get('tracks', {}).get('items', [])
+            # No artist found — only now pay for the track search
+            track_results = _cached_search(mentioned_entity, 'track', limit)
+            track_items = track_results.get('tracks', {}).get('items', [])
             if track_items:
-                tracks = [build_track(item) for item in track_items]
-                # Get related tracks from the same artist
+                seen = {}
+                for item in track_items:
+                    seen.setdefault(item['id'], build_track(item))
+                # Get related tracks from the same artist, skipping any
+                # already collected and stopping once the limit is hit
                 first_artist_id = track_items[0]['artists'][0]['id']
-                related_tracks = sp.artist_top_tracks(first_artist_id)['tracks'][:limit//2]
-                tracks.extend([build_track(item) for item in related_tracks])
-                
-                # Remove duplicates and limit to requested size
-                tracks = list({track['name']: track for track in tracks}.values())[:limit]
+                for item in _cached_top_tracks(first_artist_id)['tracks'][:limit//2]:
+                    if len(seen) >= limit:
+                        break
+                    seen.setdefault(item['id'], build_track(item))
+
+                tracks = list(seen.values())[:limit]
                 logger.info(f"Found {len(tracks)} tracks based on mentioned entity")
                 log_tracks(tracks)
+                with _recommendation_cache_lock:
+                    recommendation_cache[cache_key] = tracks
                 return tracks
 
     # If no mentioned entity or no results found, fall back to mood-based search
     query = ' '.join(filters + base_terms.split())
     logger.debug(f"Using mood-based search query: {query}")
     
-    results = sp.search(q=query, type='track', limit=limit)
+    results = _cached_search(query, 'track', limit)
     logger.info(f"Found {len(results['tracks']['items'])} tracks")
     tracks = []
     for item in results['tracks']['items']:
@@ -353,11 +684,13 @@ def get_spotify_recommendations(mood_description, user_token=None, limit=10, men
 
     if not tracks and filters:
         logger.info("No results with filters, trying without filters")
-        results = sp.search(q=base_terms, type='track', limit=limit)
+        results = _cached_search(base_terms, 'track', limit)
         tracks = [build_track(item) for item in results['tracks']['items']]
         logger.info(f"Found {len(tracks)} tracks without filters")
     
     log_tracks(tracks)
+    with _recommendation_cache_lock:
+        recommendation_cache[cache_key] = tracks
     return tracks
 
 def create_spotify_playlist(user_token, mood_description, tracks):
@@ -366,13 +699,13 @@ def create_spotify_playlist(user_token, mood_description, tracks):
         raise ValueError("No Spotify token provided")
 
     logger.info(f"Creating playlist for mood: {mood_description}")
-    user_spotify = spotipy.Spotify(auth=user_token)
+    user_spotify = get_user_spotify(user_token)
 
     user_info = user_spotify.me()
     user_id = user_info['id']
     logger.debug(f"Creating playlist for user: {user_id}")
 
-    clean_description = clean_mood_description_for_spotify(mood_description)
+    clean_description = _parse_mood(mood_description)[0]
 
     playlist_name = f"Recommended: {clean_description}"
     playlist_description = f"AI-generated playlist based on: {clean_description}"
@@ -385,8 +718,12 @@ def create_spotify_playlist(user_token, mood_description, tracks):
     )
     logger.info(f"Created playlist: {playlist_name}")
 
-    track_uris = [track['external_url'].split('/')[-1] for track in tracks]
-    user_spotify.playlist_add_items(playlist['id'], track_uris)
+    # Use the spotify:track:<id> URIs returned by the API; parsing IDs
+    # out of the share URL produced values playlist_add_items rejects
+    track_uris = [track['uri'] for track in tracks]
+    # The API caps each add at 100 items, so chunk for larger playlists
+    for i in range(0, len(track_uris), 100):
+        user_spotify.playlist_add_items(playlist['id'], track_uris[i:i+100])
     logger.info(f"Added {len(track_uris)} tracks to playlist")
 
     return {
@@ -406,12 +743,19 @@ def recommend():
             
         logger.info(f"Received recommendation request with data: {data}")
         
+        speculative_future = None
         if 'text_prompt' in data:
-            # Analyze text prompt with user role if available
-            model_response = analyze_text_prompt(
+            # The LLM analysis and a speculative Spotify search of the
+            # raw prompt are independent, so run both concurrently; the
+            # Spotify round trip hides under the slower generation call
+            analysis_future = executor.submit(
+                analyze_text_prompt,
                 data['text_prompt'],
                 user_role=data.get('user_role')
             )
+            speculative_future = executor.submit(
+                get_spotify().search, q=data['text_prompt'], type='track', limit=10)
+            model_response = analysis_future.result()
             mood_description = model_response['mood_description']
             mentioned_entity = model_response.get('mentioned_entity')
         elif 'image' in data:
@@ -430,11 +774,20 @@ def recommend():
         
         # Get recommendations from Spotify
         recommendations = get_spotify_recommendations(
-            mood_description, 
-            data.get('user_token'),
+            mood_description,
             mentioned_entity=mentioned_entity
         )
-        
+
+        # If the analyzed mood found nothing, fall back to the
+        # speculative raw-prompt search that already completed
+        if not recommendations and speculative_future is not None:
+            try:
+                speculative_items = speculative_future.result()['tracks']['items']
+                recommendations = [build_track(item) for item in speculative_items]
+                logger.info(f"Using {len(recommendations)} tracks from speculative search")
+            except Exception as e:
+                logger.warning(f"Speculative search failed: {str(e)}")
+
         response_data = {
             'mood_description': mood_description,
             'recommendations': recommendations,
@@ -459,6 +812,33 @@ def recommend():
         logger.error(f"Error in recommend endpoint: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/warmup', methods=['POST'])
+def warmup():
+    """Initialize the API clients so the first real request isn't penalized"""
+    get_spotify()
+    get_hf_client()
+    logger.info("Clients warmed up")
+    return jsonify({'status': 'warm'})
+
+@app.route('/api/cache/flush', methods=['POST'])
+def flush_cache():
+    """Clear all in-process caches so fresh results are fetched"""
+    _analyze_text_prompt_uncached.cache_clear()
+    # Take each cache's own lock so a flush can't race a concurrent
+    # insert happening under it
+    with _recommendation_cache_lock:
+        recommendation_cache.clear()
+    with _image_mood_cache_lock:
+        image_mood_cache.clear()
+    with _top_tracks_cache_lock:
+        top_tracks_cache.clear()
+    with _related_artists_cache_lock:
+        related_artists_cache.clear()
+    with _search_cache_lock:
+        search_cache.clear()
+    logger.info("Caches flushed")
+    return jsonify({'status': 'flushed'})
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     logger.debug("Health check endpoint called")
@@ -467,4 +847,6 @@ def health_check():
 if __name__ == '__main__':
     local_ip = socket.gethostbyname(socket.gethostname())
     logger.info(f"Starting server on {local_ip}:5001")
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    # Debug/reloader is opt-in for development; production serves via
+    # gunicorn (see wsgi.py) so requests don't serialize behind Werkzeug
+    app.run(host='0.0.0.0', port=5001, debug=os.getenv('FLASK_DEBUG') == '1')
@@ -0,0 +1,17 @@
+"""Gunicorn entrypoint.
+
+Run with (see Procfile):
+    gunicorn -k gevent -w 4 --worker-connections 1000 -b 0.0.0.0:5001 wsgi:app
+
+or, without gevent installed:
+    gunicorn --workers 1 --threads 8 --preload -b 0.0.0.0:5001 wsgi:app
+
+Either way, Spotify and Hugging Face I/O from different requests
+overlap instead of serializing behind Werkzeug's dev server. The
+gevent worker monkey-patches the stdlib itself at init, so don't
+combine -k gevent with --preload (the app must import post-patch).
+"""
+from app import app
+
+if __name__ == "__main__":
+    app.run()